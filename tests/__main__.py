@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+# __main__.py - run the test suite running independent tests concurrently
+#
+# Copyright (C) 2019 Daniele Varrazzo  <daniele.varrazzo@gmail.com>
+#
+# psycopg2 is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# In addition, as a special exception, the copyright holders give
+# permission to link this program with the OpenSSL library (or with
+# modified versions of OpenSSL that use the same license as OpenSSL),
+# and distribute linked combinations including the two.
+#
+# You must obey the GNU Lesser General Public License in all respects for
+# all of the code used other than OpenSSL.
+#
+# psycopg2 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Lesser General Public
+# License for more details.
+
+"""Run the test suite, with the independent tests running concurrently.
+
+Usage::
+
+    python -m tests [unittest options]
+
+The tests in the test cases listed in `test_connection.parallel_test_cases`
+are run by a thread pool, the rest of the suite as in ``make check``.
+"""
+
+import unittest
+
+from . import test_suite as full_suite
+from . import test_connection
+from .testutils import ParallelTestSuite, iter_tests
+
+
+def test_suite():
+    parallel = ParallelTestSuite(jobs=test_connection.parallel_jobs)
+    others = unittest.TestSuite()
+    for test in iter_tests(full_suite()):
+        if isinstance(test, test_connection.parallel_test_cases):
+            parallel.addTest(test)
+        else:
+            others.addTest(test)
+
+    return unittest.TestSuite([parallel, others])
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
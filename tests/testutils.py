@@ -31,7 +31,10 @@ import select
 import platform
 import unittest
 from functools import wraps
+from contextlib import contextmanager
 from ctypes.util import find_library
+from multiprocessing.pool import ThreadPool
+from unittest.suite import _ErrorHolder
 
 import psycopg2
 import psycopg2.errors
@@ -71,9 +74,23 @@ if (not hasattr(unittest.TestCase, 'assert_')
     unittest.TestCase.failUnlessEqual = unittest.TestCase.assertEqual
 
 
+# Python 2 has no subTest(): just run the block as part of the test.
+if not hasattr(unittest.TestCase, 'subTest'):
+    @contextmanager
+    def subTest(self, msg=None, **params):
+        yield
+
+    unittest.TestCase.subTest = subTest
+
+
+def dsn_tokens(dsn):
+    """Return the set of the "key=value" tokens of a conninfo string"""
+    return frozenset(dsn.split())
+
+
 def assertDsnEqual(self, dsn1, dsn2, msg=None):
     """Check that two conninfo string have the same content"""
-    self.assertEqual(set(dsn1.split()), set(dsn2.split()), msg)
+    self.assertEqual(dsn_tokens(dsn1), dsn_tokens(dsn2), msg)
 
 
 unittest.TestCase.assertDsnEqual = assertDsnEqual
@@ -109,6 +126,16 @@ class ConnectingTestCase(unittest.TestCase):
 
         return self.assertEqual(f(first), f(second), msg)
 
+    def _show(self, *names):
+        """Return the values of the settings *names* of `self.conn`.
+
+        The values are read in a single query.
+        """
+        cur = self.conn.cursor()
+        cur.execute(
+            "select " + ", ".join(["current_setting(%s)"] * len(names)), names)
+        return cur.fetchone()
+
     def connect(self, **kwargs):
         try:
             self._conns
@@ -307,11 +334,19 @@ def skip_after_postgres(*ver):
     return skip_after_postgres_
 
 
+_libpq_version = None
+
+
 def libpq_version():
-    v = psycopg2.__libpq_version__
-    if v >= 90100:
-        v = min(v, psycopg2.extensions.libpq_version())
-    return v
+    """Return the version of the libpq in use, computed on the first call."""
+    global _libpq_version
+    if _libpq_version is None:
+        v = psycopg2.__libpq_version__
+        if v >= 90100:
+            v = min(v, psycopg2.extensions.libpq_version())
+        _libpq_version = v
+
+    return _libpq_version
 
 
 def skip_before_libpq(*ver):
@@ -429,3 +464,173 @@ def slow(f):
             return self.skipTest("slow test")
         return f(self)
     return slow_
+
+
+def serial(f):
+    """Decorator to mark tests which can't run concurrently with other tests
+
+    For instance tests changing the process environment or spawning
+    subprocesses. ParallelTestSuite runs them one at a time.
+    """
+    f.serial = True
+    return f
+
+
+class _RecordingResult(object):
+    """A test result storing the calls received, to replay them later."""
+    _methods = frozenset([
+        'startTest', 'stopTest', 'addSuccess', 'addError', 'addFailure',
+        'addSkip', 'addExpectedFailure', 'addUnexpectedSuccess',
+        'addSubTest', 'addDuration'])
+
+    # Methods that results may not have, e.g. addDuration before Python 3.12
+    _optional_methods = frozenset(['addDuration'])
+
+    failfast = False
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name not in self._methods:
+            raise AttributeError(name)
+        return lambda *args: self.calls.append((name, args))
+
+    def replay(self, result):
+        for name, args in self.calls:
+            if name in self._optional_methods and not hasattr(result, name):
+                continue
+            getattr(result, name)(*args)
+
+
+def _add_fixture_error(result, description):
+    """Report the exception raised by a fixture to *result*, as unittest does.
+
+    Must be called in an except block.
+    """
+    holder = _ErrorHolder(description)
+    exc_info = sys.exc_info()
+    if isinstance(exc_info[1], unittest.SkipTest):
+        result.addSkip(holder, str(exc_info[1]))
+    else:
+        result.addError(holder, exc_info)
+
+
+def iter_tests(suite):
+    """Yield all the test cases contained in a suite, recursively."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            for t in iter_tests(test):
+                yield t
+        else:
+            yield test
+
+
+class ParallelTestSuite(unittest.TestSuite):
+    """A test suite running its tests concurrently in a pool of threads.
+
+    Tests decorated by `serial` are run afterwards, one at a time. The outcome
+    of each test is reported to the result in one go, so the output of tests
+    running together doesn't get mixed up.
+
+    The suite calls the module and class fixtures of its tests around the
+    whole run, so it should only contain tests that can share them. If a
+    fixture fails the error is reported to the result and the tests depending
+    on it are not run.
+
+    When the result is stopped (e.g. on Ctrl-C, or by failfast) the tests not
+    started yet are not run and the outcomes not reported yet are dropped. The
+    tests already running in the pool are left to complete.
+    """
+    def __init__(self, tests=(), jobs=8):
+        super(ParallelTestSuite, self).__init__(tests)
+        self.jobs = jobs
+
+    def run(self, result):
+        tests = list(iter_tests(self))
+        classes = []
+        for test in tests:
+            if test.__class__ not in classes:
+                classes.append(test.__class__)
+        modules = []
+        for cls in classes:
+            if sys.modules[cls.__module__] not in modules:
+                modules.append(sys.modules[cls.__module__])
+
+        set_up_modules = []
+        set_up_classes = []
+        failed = set()      # modules and classes whose setup failed
+        try:
+            for module in modules:
+                if getattr(module, '__unittest_skip__', False):
+                    continue
+                try:
+                    getattr(module, 'setUpModule', lambda: None)()
+                except Exception:
+                    _add_fixture_error(
+                        result, 'setUpModule (%s)' % module.__name__)
+                    failed.add(module)
+                else:
+                    set_up_modules.append(module)
+
+            for cls in classes:
+                # the tests of a skipped class report the skip themselves
+                if (sys.modules[cls.__module__] in failed
+                        or getattr(cls, '__unittest_skip__', False)):
+                    continue
+                try:
+                    cls.setUpClass()
+                except Exception:
+                    _add_fixture_error(result, 'setUpClass (%s.%s)'
+                        % (cls.__module__, cls.__name__))
+                    failed.add(cls)
+                else:
+                    set_up_classes.append(cls)
+
+            tests = [t for t in tests
+                if t.__class__ not in failed
+                and sys.modules[t.__class__.__module__] not in failed]
+
+            def run(test):
+                rec = _RecordingResult()
+                if not result.shouldStop:
+                    test(rec)
+                return rec
+
+            def is_serial(test):
+                method = getattr(test, test._testMethodName, None)
+                return getattr(method, 'serial', False)
+
+            pool = ThreadPool(self.jobs)
+            try:
+                recs = pool.map(run, [t for t in tests if not is_serial(t)])
+            finally:
+                pool.close()
+                pool.join()
+
+            for rec in recs:
+                if result.shouldStop:
+                    break
+                rec.replay(result)
+
+            for test in tests:
+                if result.shouldStop:
+                    break
+                if is_serial(test):
+                    test(result)
+
+        finally:
+            for cls in reversed(set_up_classes):
+                try:
+                    cls.tearDownClass()
+                except Exception:
+                    _add_fixture_error(result, 'tearDownClass (%s.%s)'
+                        % (cls.__module__, cls.__name__))
+            for module in reversed(set_up_modules):
+                try:
+                    getattr(module, 'tearDownModule', lambda: None)()
+                except Exception:
+                    _add_fixture_error(
+                        result, 'tearDownModule (%s)' % module.__name__)
+
+        return result